@@ -0,0 +1,76 @@
+import logging
+
+from redis import asyncio as redis
+from app.config import get_env
+
+logger = logging.getLogger(__name__)
+
+
+REDIS_URL = get_env("REDIS_URL", "redis://localhost:6379/0")
+# Kept short so a Redis host that drops packets costs a cache miss, not a hung request
+REDIS_TIMEOUT = 0.5
+
+
+redis_client = redis.Redis.from_url(
+    REDIS_URL,
+    socket_connect_timeout=REDIS_TIMEOUT,
+    socket_timeout=REDIS_TIMEOUT
+)
+
+# Set while Redis is failing, so an outage is logged once rather than on every lookup
+_cache_down = False
+
+
+def _cache_failed(action: str, key: str, error: Exception):
+    global _cache_down
+    if not _cache_down:
+        _cache_down = True
+        logger.warning("Cache %s failed for %s (further failures not logged until Redis recovers): %s", action, key, error)
+
+
+def _cache_ok():
+    global _cache_down
+    if _cache_down:
+        _cache_down = False
+        logger.info("Redis cache reachable again")
+
+
+# Cache helpers never raise: a missing or unreachable Redis only means a cache miss
+async def cache_get(key: str):
+    """
+    Read a cached value.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        Cached bytes or None on a miss or Redis error
+    """
+    try:
+        value = await redis_client.get(key)
+    except Exception as e:
+        _cache_failed("read", key, e)
+        return None
+    _cache_ok()
+    return value
+
+
+async def cache_set(key: str, value: str, ttl: int) -> bool:
+    """
+    Store a value with an expiry.
+
+    Args:
+        key: Cache key
+        value: Value to store
+        ttl: Expiry in seconds
+
+    Returns:
+        True if stored, False otherwise
+    """
+    try:
+        await redis_client.set(key, value, ex=ttl)
+    except Exception as e:
+        _cache_failed("write", key, e)
+        return False
+    _cache_ok()
+    return True
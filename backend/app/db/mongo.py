@@ -27,6 +27,48 @@ wallet_monitoring_configs = db["wallet_monitoring_configs"]
 autonomous_agent_logs = db["autonomous_agent_logs"]
 
 
+# Generated strategies that were never selected are removed after this many days
+STRATEGY_TTL_DAYS = 30
+STRATEGY_TTL_INDEX = "strategy_created_at_ttl"
+
+
+async def setup_strategy_ttl_index():
+    """
+    Expire unpicked strategies after STRATEGY_TTL_DAYS; selected/implemented ones are kept.
+    Runs in its own try so a failure here never skips the remaining indexes.
+    """
+    expire_after = STRATEGY_TTL_DAYS * 86400
+    try:
+        existing = await strategies.index_information()
+        ttl_index = existing.get(STRATEGY_TTL_INDEX)
+        if ttl_index is not None:
+            # Change the TTL in place; recreating the index with new options would conflict
+            if ttl_index.get("expireAfterSeconds") != expire_after:
+                await db.command(
+                    "collMod", "strategies",
+                    index={"name": STRATEGY_TTL_INDEX, "expireAfterSeconds": expire_after}
+                )
+            return
+        
+        # The older created_at_1 index has the same key and would conflict
+        if "created_at_1" in existing:
+            await strategies.drop_index("created_at_1")
+        # $in inside partialFilterExpression needs MongoDB 6.0+
+        await strategies.create_index(
+            "created_at",
+            name=STRATEGY_TTL_INDEX,
+            expireAfterSeconds=expire_after,
+            partialFilterExpression={"status": {"$in": ["generated", "not_selected"]}}
+        )
+    except Exception as e:
+        print(f"[WARNING] Failed to set up strategy TTL index: {str(e)}")
+        # Keep created_at sorts indexed even without expiry
+        try:
+            await strategies.create_index("created_at")
+        except Exception as e:
+            print(f"[WARNING] Failed to restore created_at index: {str(e)}")
+
+
 # Collection schemas and indexes
 async def setup_database():
     """
@@ -42,8 +84,15 @@ async def setup_database():
         
         # Strategies indexes
         await strategies.create_index("strategy_id", unique=True)
-        await strategies.create_index("wallet_address")
-        await strategies.create_index("created_at")
+        await setup_strategy_ttl_index()
+        # Covers the per-wallet status filter + newest-first sort used by
+        # strategy listing and selection
+        await strategies.create_index([("wallet_address", 1), ("status", 1), ("created_at", -1)])
+        # Newest-first listing without a status filter
+        await strategies.create_index([("wallet_address", 1), ("created_at", -1)])
+        # The compound indexes above already serve wallet_address lookups
+        if "wallet_address_1" in await strategies.index_information():
+            await strategies.drop_index("wallet_address_1")
         
         # Executions indexes
         await executions.create_index("execution_id", unique=True)
@@ -102,6 +151,26 @@ async def save_strategy(strategy_data: dict) -> str:
         raise
 
 
+async def save_strategies(strategy_docs: list) -> list:
+    """
+    Save several generated strategies in a single round-trip.
+    
+    Args:
+        strategy_docs: Strategy documents to insert
+    
+    Returns:
+        List of inserted document IDs
+    """
+    if not strategy_docs:
+        return []
+    try:
+        result = await strategies.insert_many(strategy_docs, ordered=False)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+    except Exception as e:
+        print(f"[ERROR] Failed to save strategies: {str(e)}")
+        raise
+
+
 async def get_strategy(strategy_id: str) -> dict:
     """
     Retrieve a strategy by ID.
@@ -47,7 +47,8 @@ class Execution(BaseModel):
 
 class DriftEvent(BaseModel):
     """Drift/monitor event model"""
-    id: Optional[str] = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    # Kept as the stored ObjectId so it can be passed straight back to mark_drift_event_handled
+    id: Optional[ObjectId] = Field(default=None, alias="_id")
     wallet_address: str
     event_type: str  # "drift", "large_tx", "price_shock", "rebalance_needed"
     details: Dict[str, Any]
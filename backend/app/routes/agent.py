@@ -77,7 +77,7 @@ async def get_wallet_summary(wallet_address: str = Query(...), limit: int = 5):
     {history}
 """
 
-    result = llm.invoke(prompt)
+    result = await llm.ainvoke(prompt)
     if isinstance(result, AIMessage):
         return {"summary": result.content}
     return {"summary": str(result)}
@@ -89,19 +89,23 @@ from app.services.wallet_utils import get_all_token_balances,get_erc20_balance,g
 import aiohttp
 from app.services.coingecko import fetch_token_prices
 
-def build_prompt(eth, eth_usd, usdc, usdc_usd, link, link_usd, total, user_prompt):
+def build_prompt(balances: dict, usd_values: dict, total, user_prompt):
+    """Rebalance prompt listing every held token, in the order given (ETH first)"""
+    holdings = "\n".join(
+        f"- {token}: {amount:.4f} (${usd_values[token]:,.2f})" if token == "ETH"
+        else f"- {token}: {amount:.2f} (${usd_values[token]:,.2f})"
+        for token, amount in balances.items()
+    )
     return f"""
 You are a crypto portfolio rebalancing agent.
 
 Based on the wallet's token holdings and market prices, generate **3 optimal portfolio strategies** with the following for each:
 1. A strategy label (e.g., Conservative, Balanced)
-2. Target % allocation across ETH, USDC, LINK
+2. Target % allocation across {", ".join(balances)}
 3. Rationale for the recommendation (risk, stability, yield, etc.)
 
 Wallet Balances:
-- ETH: {eth:.4f} (${eth_usd:,.2f})
-- USDC: {usdc:.2f} (${usdc_usd:,.2f})
-- LINK: {link:.2f} (${link_usd:,.2f})
+{holdings}
 Total Portfolio USD: ~${total:,.2f}
 
 User request: {user_prompt}
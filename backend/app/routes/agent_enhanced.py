@@ -8,6 +8,7 @@ from app.services.persistence import get_persistence_service, PersistenceService
 from app.services.rebalance import RebalanceService
 from app.services.agent_runner_service import get_agent_runner_service
 from app.models.strategy import Strategy, Execution
+from app.utils.ids import time_ordered_id
 from app.models.request_schemas import (
     RebalanceRequest, 
     ChooseStrategyRequest, 
@@ -45,7 +46,7 @@ async def generate_rebalance_strategies(
         
         for strategy_data in strategies_data.get("strategies", []):
             strategy = Strategy(
-                strategy_id=f"strategy_{uuid.uuid4().hex[:8]}",
+                strategy_id=time_ordered_id("strategy"),
                 wallet_address=request.wallet_address,
                 label=strategy_data.get("label", "Generated Strategy"),
                 target_allocation=strategy_data.get("target_allocation", {}),
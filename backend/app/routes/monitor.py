@@ -13,12 +13,25 @@ from app.models.request_schemas import (
 )
 from app.models.response_schemas import (
     AgentStatusResponse,
-    MonitorEventsResponse,
     MonitorStatusResponse
 )
 
 router = APIRouter(prefix="/monitor", tags=["monitoring"])
 
+# DriftEvent fields other than id, with the plain defaults older events may be missing
+_EVENT_FIELDS = [
+    (name, None if field.is_required() or field.default_factory else field.default)
+    for name, field in DriftEvent.model_fields.items()
+    if name != "id"
+]
+
+def _event_to_dict(doc: dict) -> dict:
+    """Same shape as DriftEvent(**doc).dict(): string id and only the model's fields"""
+    event = {"id": str(doc["_id"])}
+    for name, default in _EVENT_FIELDS:
+        event[name] = doc.get(name, default)
+    return event
+
 @router.post("/subscribe")
 async def subscribe_wallet(
     request: WalletSubscribeRequest,
@@ -65,9 +78,9 @@ async def get_agent_status(
             mode=preferences.mode if preferences else "manual",
             auto_execute=preferences.auto_execute if preferences else False,
             last_check=datetime.utcnow(),  # TODO: Get actual last check time
-            recent_executions=[exec.dict() for exec in recent_executions],
-            recent_events=[DriftEvent(**event).dict() for event in recent_events],
-            preferences=preferences.dict() if preferences else None
+            recent_executions=recent_executions,
+            recent_events=[DriftEvent.model_construct(**event) for event in recent_events],
+            preferences=preferences
         )
         
     except Exception as e:
@@ -79,7 +92,7 @@ async def get_monitor_events(
     limit: int = 20,
     event_type: Optional[str] = None,
     persistence: PersistenceService = Depends(get_persistence_service)
-) -> MonitorEventsResponse:
+) -> dict:
     """Get monitoring events for a wallet"""
     try:
         query = {"wallet_address": wallet_address}
@@ -89,11 +102,12 @@ async def get_monitor_events(
         cursor = persistence.drift_events.find(query).sort("created_at", -1).limit(limit)
         events = await cursor.to_list(length=limit)
         
-        return MonitorEventsResponse(
-            wallet_address=wallet_address,
-            events=[DriftEvent(**event).dict() for event in events],
-            total_count=len(events)
-        )
+        # Only the id needs converting; datetimes are written as ISO strings on the way out
+        return {
+            "wallet_address": wallet_address,
+            "events": [_event_to_dict(event) for event in events],
+            "total_count": len(events)
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting monitor events: {str(e)}")
@@ -1,17 +1,30 @@
 # this file ensures efficient use of the llm when the prompts from the user are simple or when they are offline
 import re
+import sys
+from typing import Any, Dict, Optional
 
-def fallback_parse(prompt: str):
+# Known tokens map straight to a shared uppercase string instead of calling .upper() per match
+_TOKENS = {t: sys.intern(t.upper()) for t in ("eth", "usdc", "usdt", "btc", "wbtc", "matic", "sol", "dai", "link", "weth")}
+
+def _token(symbol: str) -> str:
+    return _TOKENS.get(symbol) or symbol.upper()
+
+# Patterns are compiled once; the module is fully annotated so it can also be built with mypyc
+_SWAP_RE = re.compile(r"swap\s+([\d.]+)?\s*(\w+)\s+(to|for)\s+(\w+)")
+_BALANCE_RE = re.compile(r"how much\s+(\w+)\s+do i have")
+_SEND_RE = re.compile(r"send\s+([\d.]+)\s+(\w+)\s+to\s+(0x[a-fA-F0-9]{40})")
+
+def fallback_parse(prompt: str) -> Optional[Dict[str, Any]]:
     prompt = prompt.lower()
 
     #Rule:swapping
-    swap_match = re.search(r"swap\s+([\d.]+)?\s*(\w+)\s+(to|for)\s+(\w+)", prompt)
+    swap_match = _SWAP_RE.search(prompt)
     if swap_match:
         return {
             "intent": "swap",
             "amount": float(swap_match.group(1)) if swap_match.group(1) else None,
-            "from_token": swap_match.group(2).upper(),
-            "to_token": swap_match.group(4).upper()
+            "from_token": _token(swap_match.group(2)),
+            "to_token": _token(swap_match.group(4))
         }
 
     #Rule: POrtfolio Checking
@@ -19,20 +32,20 @@ def fallback_parse(prompt: str):
         return {"intent": "portfolio_check"}
 
     #Rule:balance heck
-    bal_match = re.search(r"how much\s+(\w+)\s+do i have", prompt)
+    bal_match = _BALANCE_RE.search(prompt)
     if bal_match:
         return {
             "intent": "check_balance",
-            "token": bal_match.group(1).upper()
+            "token": _token(bal_match.group(1))
         }
 
     #rule: Tokensend
-    send_match = re.search(r"send\s+([\d.]+)\s+(\w+)\s+to\s+(0x[a-fA-F0-9]{40})", prompt)
+    send_match = _SEND_RE.search(prompt)
     if send_match:
         return {
             "intent": "send",
             "amount": float(send_match.group(1)),
-            "token": send_match.group(2).upper(),
+            "token": _token(send_match.group(2)),
             "to_address": send_match.group(3)
         }
 
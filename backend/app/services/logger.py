@@ -1,6 +1,63 @@
+import asyncio
 from datetime import datetime
+from typing import Optional
 from app.db.mongo import agent_logs
 
-async def log_agent_interaction(data: dict):
-    data["timestamp"] = datetime.utcnow()
-    await agent_logs.insert_one(data)
+
+class LogBuffer:
+    """Collects agent log entries in memory and writes them to Mongo in batches"""
+
+    def __init__(self, max_batch: int = 500, flush_interval: float = 0.25):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+
+    async def put(self, data: dict):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await self.queue.put(data)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await self.queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    await self._write(batch)
+                    return
+                batch.append(entry)
+            await self._write(batch)
+
+    async def _write(self, batch: list):
+        try:
+            await agent_logs.insert_many(batch, ordered=False)
+        except Exception as e:
+            print(f"[ERROR] Failed to flush {len(batch)} agent logs: {str(e)}")
+
+    async def flush(self):
+        """Write out everything still queued and stop the background writer"""
+        if self._task is not None and not self._task.done():
+            await self.queue.put(None)
+            await self._task
+        self._task = None
+
+
+agent_log_buffer = LogBuffer()
+
+
+async def log_agent_interaction(data: dict, ts: Optional[datetime] = None):
+    # Callers logging a batch can pass one timestamp for all of its entries
+    data["timestamp"] = ts or datetime.utcnow()
+    await agent_log_buffer.put(data)
@@ -1,13 +1,38 @@
 # app/services/persistence.py
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import asyncio
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient
+from cachetools import TTLCache
+from bson import ObjectId
 import uuid
 from app.models.strategy import Strategy, Execution, DriftEvent, WalletPreferences, Performance
+from app.utils.ids import time_ordered_id
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# (field name, stored key) pairs per model, resolved once at import
+_FAST_FIELDS = {
+    model: tuple((name, field.alias or name) for name, field in model.model_fields.items())
+    for model in (Strategy, Execution, DriftEvent, WalletPreferences, Performance)
+}
+
+def _to_document(model) -> Dict[str, Any]:
+    """Equivalent of model.dict(by_alias=True, exclude_unset=True) without the recursive walk"""
+    fields_set = model.model_fields_set
+    return {
+        alias: getattr(model, name)
+        for name, alias in _FAST_FIELDS[type(model)]
+        if name in fields_set
+    }
+
+def _from_document(model, doc: Dict[str, Any]):
+    """Build a model from a stored document without validation; _id becomes the str id field"""
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    return model.model_construct(**doc)
+
 class PersistenceService:
     def __init__(self, db_client: AsyncIOMotorClient, db_name: str = "portfolio_agent"):
         self.db = db_client[db_name]
@@ -16,16 +41,18 @@ class PersistenceService:
         self.drift_events = self.db.drift_events
         self.wallet_preferences = self.db.wallet_preferences
         self.performances = self.db.performances
+        # Preferences change rarely but are read on every monitor check
+        self._pref_cache = TTLCache(maxsize=10000, ttl=60)
     
     # Strategy operations
     async def save_strategy(self, strategy: Strategy) -> str:
         """Save a strategy to database"""
         try:
-            strategy_dict = strategy.dict(by_alias=True, exclude_unset=True)
+            strategy_dict = _to_document(strategy)
             if not strategy_dict.get("strategy_id"):
-                strategy_dict["strategy_id"] = f"strategy_{uuid.uuid4().hex[:8]}"
+                strategy_dict["strategy_id"] = time_ordered_id("strategy")
             
-            result = await self.strategies.insert_one(strategy_dict)
+            await self.strategies.insert_one(strategy_dict)
             logger.info(f"Strategy saved: {strategy_dict['strategy_id']}")
             return strategy_dict["strategy_id"]
         except Exception as e:
@@ -36,14 +63,15 @@ class PersistenceService:
         """Save multiple strategies at once"""
         try:
             strategy_ids = []
+            strategy_dicts = []
             for strategy in strategies:
-                strategy_dict = strategy.dict(by_alias=True, exclude_unset=True)
+                strategy_dict = _to_document(strategy)
                 if not strategy_dict.get("strategy_id"):
-                    strategy_dict["strategy_id"] = f"strategy_{uuid.uuid4().hex[:8]}"
+                    strategy_dict["strategy_id"] = time_ordered_id("strategy")
                 strategy_ids.append(strategy_dict["strategy_id"])
-            
-            strategy_dicts = [s.dict(by_alias=True, exclude_unset=True) for s in strategies]
-            await self.strategies.insert_many(strategy_dicts)
+                strategy_dicts.append(strategy_dict)
+
+            await self.strategies.insert_many(strategy_dicts, ordered=False)
             logger.info(f"Batch saved {len(strategies)} strategies")
             return strategy_ids
         except Exception as e:
@@ -54,7 +82,7 @@ class PersistenceService:
         """Get strategy by ID"""
         try:
             doc = await self.strategies.find_one({"strategy_id": strategy_id})
-            return Strategy(**doc) if doc else None
+            return _from_document(Strategy, doc) if doc else None
         except Exception as e:
             logger.error(f"Error getting strategy {strategy_id}: {e}")
             return None
@@ -67,7 +95,7 @@ class PersistenceService:
             ).sort("created_at", -1).limit(limit)
             
             docs = await cursor.to_list(length=limit)
-            return [Strategy(**doc) for doc in docs]
+            return [_from_document(Strategy, doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting strategies for wallet {wallet_address}: {e}")
             return []
@@ -76,11 +104,11 @@ class PersistenceService:
     async def save_execution(self, execution: Execution) -> str:
         """Save an execution record"""
         try:
-            execution_dict = execution.dict(by_alias=True, exclude_unset=True)
+            execution_dict = _to_document(execution)
             if not execution_dict.get("execution_id"):
                 execution_dict["execution_id"] = f"exec_{uuid.uuid4().hex[:8]}"
             
-            result = await self.executions.insert_one(execution_dict)
+            await self.executions.insert_one(execution_dict)
             logger.info(f"Execution saved: {execution_dict['execution_id']}")
             return execution_dict["execution_id"]
         except Exception as e:
@@ -96,14 +124,15 @@ class PersistenceService:
     ) -> bool:
         """Update execution status"""
         try:
-            update_data = {"status": status, "updated_at": datetime.utcnow()}
+            now = datetime.utcnow()
+            update_data = {"status": status, "updated_at": now}
             
             if tx_hashes:
                 update_data["tx_hashes"] = tx_hashes
             if error_message:
                 update_data["error_message"] = error_message
             if status == "confirmed":
-                update_data["confirmed_at"] = datetime.utcnow()
+                update_data["confirmed_at"] = now
             
             result = await self.executions.update_one(
                 {"execution_id": execution_id},
@@ -118,7 +147,7 @@ class PersistenceService:
         """Get execution by ID"""
         try:
             doc = await self.executions.find_one({"execution_id": execution_id})
-            return Execution(**doc) if doc else None
+            return _from_document(Execution, doc) if doc else None
         except Exception as e:
             logger.error(f"Error getting execution {execution_id}: {e}")
             return None
@@ -137,34 +166,33 @@ class PersistenceService:
             
             cursor = self.executions.find(query).sort("created_at", -1).limit(limit)
             docs = await cursor.to_list(length=limit)
-            return [Execution(**doc) for doc in docs]
+            return [_from_document(Execution, doc) for doc in docs]
         except Exception as e:
             logger.error(f"Error getting executions for wallet {wallet_address}: {e}")
             return []
     
     # Drift event operations
-    async def save_drift_event(self, drift_event: DriftEvent) -> str:
+    async def save_drift_event(self, drift_event: DriftEvent) -> ObjectId:
         """Save a drift/monitor event"""
         try:
-            event_dict = drift_event.dict(by_alias=True, exclude_unset=True)
+            event_dict = _to_document(drift_event)
             result = await self.drift_events.insert_one(event_dict)
             logger.info(f"Drift event saved for wallet {drift_event.wallet_address}")
-            return str(result.inserted_id)
+            return result.inserted_id
         except Exception as e:
             logger.error(f"Error saving drift event: {e}")
             raise
     
-    async def get_unhandled_drift_events(self) -> List[DriftEvent]:
-        """Get all unhandled drift events"""
+    async def iter_unhandled_drift_events(self) -> AsyncIterator[DriftEvent]:
+        """Stream unhandled drift events, oldest first"""
         try:
             cursor = self.drift_events.find({"handled": False}).sort("created_at", 1)
-            docs = await cursor.to_list(length=None)
-            return [DriftEvent(**doc) for doc in docs]
+            async for doc in cursor:
+                yield DriftEvent.model_construct(**doc)
         except Exception as e:
             logger.error(f"Error getting unhandled drift events: {e}")
-            return []
     
-    async def mark_drift_event_handled(self, event_id: str, strategy_id: Optional[str] = None) -> bool:
+    async def mark_drift_event_handled(self, event_id: ObjectId, strategy_id: Optional[str] = None) -> bool:
         """Mark drift event as handled"""
         try:
             update_data = {"handled": True, "handled_at": datetime.utcnow()}
@@ -184,14 +212,20 @@ class PersistenceService:
     async def save_wallet_preferences(self, preferences: WalletPreferences) -> str:
         """Save or update wallet preferences"""
         try:
-            preferences_dict = preferences.dict(by_alias=True, exclude_unset=True)
+            preferences_dict = _to_document(preferences)
             preferences_dict["updated_at"] = datetime.utcnow()
             
-            result = await self.wallet_preferences.replace_one(
+            # Only touch the fields the caller set; identity fields are written once
+            on_insert = {"created_at": preferences_dict.pop("created_at", preferences_dict["updated_at"])}
+            if "_id" in preferences_dict:
+                on_insert["_id"] = preferences_dict.pop("_id")
+            
+            await self.wallet_preferences.update_one(
                 {"wallet_address": preferences.wallet_address},
-                preferences_dict,
+                {"$set": preferences_dict, "$setOnInsert": on_insert},
                 upsert=True
             )
+            self._pref_cache.pop(preferences.wallet_address, None)
             logger.info(f"Preferences saved for wallet {preferences.wallet_address}")
             return preferences.wallet_address
         except Exception as e:
@@ -200,9 +234,17 @@ class PersistenceService:
     
     async def get_wallet_preferences(self, wallet_address: str) -> Optional[WalletPreferences]:
         """Get wallet preferences"""
+        # Callers get their own copy so changing it can't alter the cached one
+        cached = self._pref_cache.get(wallet_address)
+        if cached is not None:
+            return cached.model_copy(deep=True)
         try:
             doc = await self.wallet_preferences.find_one({"wallet_address": wallet_address})
-            return WalletPreferences(**doc) if doc else None
+            if not doc:
+                return None
+            preferences = _from_document(WalletPreferences, doc)
+            self._pref_cache[wallet_address] = preferences
+            return preferences.model_copy(deep=True)
         except Exception as e:
             logger.error(f"Error getting wallet preferences: {e}")
             return None
@@ -210,7 +252,10 @@ class PersistenceService:
     async def get_auto_mode_wallets(self) -> List[str]:
         """Get all wallets with auto mode enabled"""
         try:
-            cursor = self.wallet_preferences.find({"mode": "auto"})
+            cursor = self.wallet_preferences.find(
+                {"mode": "auto"},
+                {"wallet_address": 1, "_id": 0}
+            )
             docs = await cursor.to_list(length=None)
             return [doc["wallet_address"] for doc in docs]
         except Exception as e:
@@ -221,7 +266,7 @@ class PersistenceService:
     async def save_performance(self, performance: Performance) -> str:
         """Save performance metrics"""
         try:
-            performance_dict = performance.dict(by_alias=True, exclude_unset=True)
+            performance_dict = _to_document(performance)
             result = await self.performances.insert_one(performance_dict)
             logger.info(f"Performance saved for execution {performance.execution_id}")
             return str(result.inserted_id)
@@ -229,12 +274,12 @@ class PersistenceService:
             logger.error(f"Error saving performance: {e}")
             raise
     
-    async def get_wallet_performance_history(
+    async def iter_wallet_performance_history(
         self, 
         wallet_address: str, 
         days: int = 30
-    ) -> List[Performance]:
-        """Get performance history for wallet"""
+    ) -> AsyncIterator[Performance]:
+        """Stream performance history for wallet, newest first"""
         try:
             from_date = datetime.utcnow() - timedelta(days=days)
             cursor = self.performances.find({
@@ -242,27 +287,30 @@ class PersistenceService:
                 "created_at": {"$gte": from_date}
             }).sort("created_at", -1)
             
-            docs = await cursor.to_list(length=None)
-            return [Performance(**doc) for doc in docs]
+            async for doc in cursor:
+                yield _from_document(Performance, doc)
         except Exception as e:
             logger.error(f"Error getting performance history: {e}")
-            return []
+    
+    async def get_wallet_performance_history(
+        self, 
+        wallet_address: str, 
+        days: int = 30
+    ) -> List[Performance]:
+        """Get performance history for wallet"""
+        return [p async for p in self.iter_wallet_performance_history(wallet_address, days)]
     
     # Memory for LLM context
     async def get_wallet_memory_context(self, wallet_address: str, limit: int = 5) -> Dict[str, Any]:
         """Get memory context for LLM prompts"""
         try:
-            # Get recent strategies
-            recent_strategies = await self.get_strategies_by_wallet(wallet_address, limit=limit)
-            
-            # Get recent executions
-            recent_executions = await self.get_executions_by_wallet(wallet_address, limit=limit)
-            
-            # Get recent performance
-            recent_performance = await self.get_wallet_performance_history(wallet_address, days=7)
-            
-            # Get preferences
-            preferences = await self.get_wallet_preferences(wallet_address)
+            # The four lookups are independent, so run them concurrently
+            recent_strategies, recent_executions, recent_performance, preferences = await asyncio.gather(
+                self.get_strategies_by_wallet(wallet_address, limit=limit),
+                self.get_executions_by_wallet(wallet_address, limit=limit),
+                self.get_wallet_performance_history(wallet_address, days=7),
+                self.get_wallet_preferences(wallet_address)
+            )
             
             return {
                 "recent_strategies": [s.dict() for s in recent_strategies],
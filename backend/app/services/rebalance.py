@@ -1,39 +1,86 @@
-import uuid
+import asyncio
+import hashlib
+import logging
 from typing import Dict, List
 from datetime import datetime, timezone
-import aiohttp
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
 
 from app.models.request_schemas import AgentQueryRequest
 from app.routes.agent import build_prompt, parse_strategies
 from app.services.agent_runner import llm
 from app.services.coingecko import fetch_token_prices
-from app.services.wallet_utils import get_eth_balance, get_erc20_balance
-from app.db.mongo import strategies, save_strategy, save_wallet_info
+from app.services.startup import startup_service
+from app.services.wallet_utils import ERC20_TOKENS, cached_get_eth_balance, cached_get_erc20_balance
+from app.db.mongo import strategies, save_strategies, save_wallet_info
+from app.db.cache import cache_get, cache_set
+from app.utils.ids import time_ordered_id
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Symbols priced for every rebalance: ETH plus the tracked ERC-20 tokens
+PRICE_SYMBOLS = ["ETH", *ERC20_TOKENS]
+
+# Seconds an LLM answer is reused for an identical rebalance prompt
+LLM_CACHE_TTL = 60
+
+
+# Caps concurrent background Mongo writes scheduled by request handlers
+_db_write_semaphore = asyncio.Semaphore(50)
+# Strong references so pending write tasks aren't garbage collected
+_background_writes = set()
+
+
+def _on_background_write_done(task: asyncio.Task):
+    _background_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background write failed: %s", task.exception())
+
+
+def schedule_write(coro):
+    """Run a DB write off the request path, bounded by the write semaphore"""
+    async def guarded():
+        async with _db_write_semaphore:
+            await coro
 
-# Utility to assign a unique ID to each strategy and save to DB
-async def attach_ids_and_save(strategies_list: list, wallet_address: str, user_prompt: str):
+    task = asyncio.create_task(guarded())
+    _background_writes.add(task)
+    task.add_done_callback(_on_background_write_done)
+    return task
+
+
+async def drain_background_writes():
+    """Wait for every scheduled write to finish; called on shutdown so none are dropped"""
+    if _background_writes:
+        logger.info("Waiting for %d background writes", len(_background_writes))
+        await asyncio.gather(*_background_writes, return_exceptions=True)
+
+
+# Utility to assign a unique ID to each strategy
+def attach_ids(strategies_list: list, wallet_address: str, user_prompt: str) -> list:
     """
-    Attach unique IDs to strategies and save them to database.
+    Attach unique IDs to strategies and build their database documents.
     
     Args:
-        strategies_list: List of strategy dictionaries
+        strategies_list: List of strategy dictionaries (updated in place)
         wallet_address: Wallet address that requested strategies
         user_prompt: Original user prompt
     
     Returns:
-        Updated strategies list with IDs
+        Strategy documents ready to be saved
     """
+    created_at = datetime.now(timezone.utc)
+    strategy_docs = []
     for strategy in strategies_list:
-        strategy_id = f"strategy_{uuid.uuid4().hex[:8]}"
+        strategy_id = time_ordered_id("strategy")
         strategy["strategy_id"] = strategy_id
         
         # Prepare strategy document for database
-        strategy_doc = {
+        strategy_docs.append({
             "strategy_id": strategy_id,
             "wallet_address": wallet_address,
             "user_prompt": user_prompt,
@@ -43,19 +90,28 @@ async def attach_ids_and_save(strategies_list: list, wallet_address: str, user_p
             "expected_return": strategy.get("expected_return", 0),
             "sharpe_ratio": strategy.get("sharpe_ratio", 0),
             "risk_level": strategy.get("risk_level", "medium"),
-            "created_at": datetime.now(timezone.utc),
+            "created_at": created_at,
             "status": "generated",
             "implementation_status": "not_implemented"
-        }
-        
-        # Save strategy to database
-        try:
-            await save_strategy(strategy_doc)
-            print(f"[INFO] Saved strategy {strategy_id} to database")
-        except Exception as e:
-            print(f"[ERROR] Failed to save strategy {strategy_id}: {str(e)}")
+        })
+    return strategy_docs
+
+
+async def save_strategy_docs(strategy_docs: list):
+    """
+    Save strategy documents, logging rather than raising on failure.
     
-    return strategies_list
+    Args:
+        strategy_docs: Documents built by attach_ids
+    """
+    # Save all strategies in one batch; unordered so one bad document doesn't block the rest
+    try:
+        await save_strategies(strategy_docs)
+        logger.info("Saved %d strategies to database", len(strategy_docs))
+    except BulkWriteError as e:
+        logger.error("Failed to save %d of %d strategies: %s", len(e.details.get('writeErrors', [])), len(strategy_docs), e)
+    except Exception as e:
+        logger.error("Failed to save strategies: %s", e)
 
 
 # Endpoint 1: Generate Rebalance Strategies
@@ -65,14 +121,19 @@ async def generate_rebalance(data: AgentQueryRequest):
     user_prompt = data.prompt
 
     try:
-        print("[INFO] Rebalance request triggered.")
-        async with aiohttp.ClientSession() as session:
-            eth = await get_eth_balance(w_address, session)
-            usdc = await get_erc20_balance(w_address, " b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", 6, session) #OWN
-            link = await get_erc20_balance(w_address, "0x514910771af9ca656af840dff83e8264ecf986ca", 18, session)
-
-        balances = {"ETH": eth, "USDC": usdc, "LINK": link}
-        prices = await fetch_token_prices(["ETH", "USDC", "LINK"])
+        logger.info("Rebalance request triggered.")
+        # Balances and prices are independent requests, so fetch them all at once
+        session = startup_service.get_session()
+        eth, prices, *token_balances = await asyncio.gather(
+            cached_get_eth_balance(w_address, session),
+            fetch_token_prices(PRICE_SYMBOLS),
+            *(
+                cached_get_erc20_balance(w_address, info["contract"], info["decimals"], session)
+                for info in ERC20_TOKENS.values()
+            )
+        )
+
+        balances = {"ETH": eth, **dict(zip(ERC20_TOKENS, token_balances))}
         usd_values = {k: round(v * prices[k], 2) for k, v in balances.items()}
         total = round(sum(usd_values.values()), 2)
 
@@ -86,18 +147,32 @@ async def generate_rebalance(data: AgentQueryRequest):
             "last_updated": datetime.now(timezone.utc),
             "last_query": user_prompt
         }
-        await save_wallet_info(wallet_data)
+        # The client doesn't need write confirmation, so persist off the request path
+        schedule_write(save_wallet_info(wallet_data))
+
+        prompt = build_prompt(balances, usd_values, total, user_prompt)
 
-        prompt = build_prompt(eth, usd_values["ETH"], usdc, usd_values["USDC"], link, usd_values["LINK"], total, user_prompt)
-        llm_output = llm.invoke(prompt)
-        raw_text = llm_output.content if hasattr(llm_output, "content") else str(llm_output)
-        print("RAW_TEXT:", raw_text)
+        # The prompt already rounds balances and USD values, so identical prompts
+        # can reuse a recent LLM answer; strategy IDs are still assigned fresh below
+        cache_key = "llm:" + hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        cached_text = await cache_get(cache_key)
+        from_cache = cached_text is not None
+        if from_cache:
+            raw_text = cached_text.decode()
+        else:
+            llm_output = await llm.ainvoke(prompt)
+            raw_text = llm_output.content if hasattr(llm_output, "content") else str(llm_output)
+        logger.debug("RAW_TEXT: %s", raw_text)
         
         strategies_list = parse_strategies(raw_text)
-        strategies_list = await attach_ids_and_save(strategies_list, w_address, user_prompt)
-        print("STRATEGIES:", strategies_list)
+        # Only cache answers that produced strategies, so a retry after an empty one asks the LLM again
+        if strategies_list and not from_cache:
+            await cache_set(cache_key, raw_text, LLM_CACHE_TTL)
+        # IDs are assigned now so the response carries them; the insert runs in the background
+        schedule_write(save_strategy_docs(attach_ids(strategies_list, w_address, user_prompt)))
+        logger.debug("STRATEGIES: %s", strategies_list)
 
-        print("[INFO] Returning generated strategies.")
+        logger.info("Returning generated strategies.")
         return {
             "strategies": strategies_list,
             "total_usd_value": total,
@@ -107,7 +182,7 @@ async def generate_rebalance(data: AgentQueryRequest):
         }
 
     except Exception as e:
-        print(f"[ERROR] Rebalance generation failed: {str(e)}")
+        logger.error("Rebalance generation failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -133,34 +208,37 @@ async def choose_strategy(data: StrategySelectionRequest):
         strategy = data.chosen_strategy
         wallet = data.wallet_address
 
-        # Update strategy status in database
-        await strategies.update_one(
-            {"strategy_id": strategy.strategy_id},
-            {
-                "$set": {
-                    "status": "selected",
-                    "selected_at": datetime.now(timezone.utc),
-                    "selected_by_wallet": wallet
-                }
-            }
-        )
+        now = datetime.now(timezone.utc)
 
-        # Mark other strategies for this wallet as not selected
-        await strategies.update_many(
-            {
-                "wallet_address": wallet,
-                "strategy_id": {"$ne": strategy.strategy_id},
-                "status": "generated"
-            },
-            {
-                "$set": {
-                    "status": "not_selected",
-                    "updated_at": datetime.now(timezone.utc)
+        # Select the chosen strategy and mark the wallet's other strategies as
+        # not selected in one round-trip
+        await strategies.bulk_write([
+            UpdateOne(
+                {"strategy_id": strategy.strategy_id},
+                {
+                    "$set": {
+                        "status": "selected",
+                        "selected_at": now,
+                        "selected_by_wallet": wallet
+                    }
                 }
-            }
-        )
+            ),
+            UpdateMany(
+                {
+                    "wallet_address": wallet,
+                    "strategy_id": {"$ne": strategy.strategy_id},
+                    "status": "generated"
+                },
+                {
+                    "$set": {
+                        "status": "not_selected",
+                        "updated_at": now
+                    }
+                }
+            )
+        ], ordered=True)
 
-        print(f"[INFO] Strategy {strategy.strategy_id} selected for wallet {wallet}")
+        logger.info("Strategy %s selected for wallet %s", strategy.strategy_id, wallet)
 
         return {
             "status": "success",
@@ -180,7 +258,7 @@ async def choose_strategy(data: StrategySelectionRequest):
         }
 
     except Exception as e:
-        print(f"[ERROR] Strategy selection failed: {str(e)}")
+        logger.error("Strategy selection failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -205,31 +283,28 @@ async def get_strategy_details(strategy_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[ERROR] Failed to get strategy details: {str(e)}")
+        logger.error("Failed to get strategy details: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Endpoint 4: Get All Strategies for Wallet
 @router.get("/strategies")
-async def get_wallet_strategies(wallet: str, status: str = None):
+async def get_wallet_strategies(wallet: str, status: str = None, limit: int = Query(50, ge=1, le=200)):
     """
-    Get all strategies generated for a wallet address.
+    Get the most recent strategies generated for a wallet address.
     
     Args:
         wallet: Wallet address
         status: Optional status filter ('generated', 'selected', 'implemented')
+        limit: Maximum number of strategies to return (1-200)
     """
     try:
         query_filter = {"wallet_address": wallet}
         if status:
             query_filter["status"] = status
         
-        cursor = strategies.find(query_filter).sort("created_at", -1)
-        
-        strategy_list = []
-        async for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            strategy_list.append(doc)
+        cursor = strategies.find(query_filter, projection={"_id": 0}).sort("created_at", -1).limit(limit)
+        strategy_list = await cursor.to_list(length=limit)
         
         return {
             "wallet_address": wallet,
@@ -239,5 +314,5 @@ async def get_wallet_strategies(wallet: str, status: str = None):
         }
     
     except Exception as e:
-        print(f"[ERROR] Failed to get wallet strategies: {str(e)}")
+        logger.error("Failed to get wallet strategies: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
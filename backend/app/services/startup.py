@@ -10,8 +10,13 @@ import asyncio
 import logging
 from typing import Optional
 
+import aiohttp
+
 from app.services.autonomous_agent import autonomous_agent_service
+from app.services.logger import agent_log_buffer
+from app.services.web3_utils import attach_web3_session
 from app.db.mongo import wallet_monitoring_configs
+from app.db.cache import redis_client
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +25,21 @@ class StartupService:
     
     def __init__(self):
         self.autonomous_agent_started = False
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    def get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session so outbound connections stay warm across requests"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+        return self.session
+    
+    async def close_session(self):
+        """Close the shared HTTP session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
     
     async def initialize_autonomous_agent(self):
         """Initialize and start the autonomous agent service"""
@@ -69,8 +89,16 @@ startup_service = StartupService()
 
 async def initialize_startup_services():
     """Initialize all startup services"""
+    session = startup_service.get_session()
+    await attach_web3_session(session)
     await startup_service.initialize_autonomous_agent()
 
 async def shutdown_startup_services():
     """Shutdown all startup services"""
     await startup_service.shutdown_autonomous_agent()
+    # Imported here: rebalance imports startup_service from this module
+    from app.services.rebalance import drain_background_writes
+    await drain_background_writes()
+    await startup_service.close_session()
+    await agent_log_buffer.flush()
+    await redis_client.aclose()
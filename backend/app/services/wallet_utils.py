@@ -1,7 +1,15 @@
 # app/services/wallet_utils.py
 from app.config import get_env
 import aiohttp
-import asyncio  # Added for delay
+import asyncio
+import logging
+import orjson
+import re
+from typing import Awaitable, Callable, Dict, List, Optional
+from aiolimiter import AsyncLimiter
+from app.db.cache import cache_get, cache_set
+
+logger = logging.getLogger(__name__)
 
 # Sepolia ERC-20 token contracts  
 ERC20_TOKENS = {
@@ -15,69 +23,205 @@ ERC20_TOKENS = {
     }
 }
 
+_ADDR_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+# Fail at import rather than on every request if a token entry is malformed
+for _token, _info in ERC20_TOKENS.items():
+    if not _ADDR_RE.match(_info["contract"]):
+        raise ValueError(f"Invalid contract address for {_token}: {_info['contract']!r}")
+
+# Known tokens by lowercased contract, for picking them out of a full holdings listing
+_TOKENS_BY_CONTRACT = {info["contract"].lower(): (token, info["decimals"]) for token, info in ERC20_TOKENS.items()}
+
 ETHERSCAN_API_KEY = get_env("ETHERSCAN_API_KEY")
 ETHERSCAN_BASE_URL = "https://api-sepolia.etherscan.io/api"
 
+# Token unit divisors for the decimals we deal with, computed once
+_DIV = {d: float(10 ** d) for d in (6, 8, 9, 18)}
+ETHERSCAN_MAX_RETRIES = 3
+# balancemulti accepts at most this many addresses per call
+ETHERSCAN_MULTI_LIMIT = 20
+# Balances only change once per block (~12 s), so a short cache absorbs repeat requests
+BALANCE_CACHE_TTL = 10
+
+# Etherscan's free tier allows 5 calls per second
+_etherscan_limiter = AsyncLimiter(5, 1)
+
+def _is_rate_limited(status: int, data: dict) -> bool:
+    return status == 429 or "rate limit" in str(data.get("result", "")).lower()
+
+async def _etherscan_get(url: str, session) -> dict:
+    """GET an Etherscan endpoint, backing off only when the API reports a rate limit"""
+    for attempt in range(ETHERSCAN_MAX_RETRIES + 1):
+        async with _etherscan_limiter:
+            async with session.get(url) as response:
+                status = response.status
+                # Etherscan always answers JSON, so skip aiohttp's content-type/charset checks
+                data = orjson.loads(await response.read()) if status != 429 else {}
+        if attempt == ETHERSCAN_MAX_RETRIES or not _is_rate_limited(status, data):
+            return data
+        await asyncio.sleep(0.5 * 2 ** attempt)
+
 async def get_eth_balance(address: str, session) -> float:
     url = f"{ETHERSCAN_BASE_URL}?module=account&action=balance&address={address}&tag=latest&apikey={ETHERSCAN_API_KEY}"
     
-    async with session.get(url) as response:
-        data = await response.json()
-        if data.get("status") == "1":
-            wei_balance = int(data["result"])
-            return wei_balance / 1e18
-        else:
-            raise Exception(f"Etherscan error: {data.get('message')}")
+    data = await _etherscan_get(url, session)
+    if data.get("status") == "1":
+        wei_balance = int(data["result"])
+        return wei_balance / _DIV[18]
+    else:
+        raise Exception(f"Etherscan error: {data.get('message')}")
 
-async def get_erc20_balance(address: str, contract_address: str, decimals: int, session: aiohttp.ClientSession) -> float:
+async def fetch_erc20_balance(address: str, contract_address: str, decimals: int, session: aiohttp.ClientSession) -> float:
+    """Token balance that raises on any failure, so a real zero can be told apart from an error"""
     # Validate contract address format
-    if not contract_address or not contract_address.startswith('0x') or len(contract_address) != 42:
-        print(f"Invalid contract address format: {contract_address}")
-        return 0.0
+    if not contract_address or not _ADDR_RE.match(contract_address):
+        raise ValueError(f"Invalid contract address format: {contract_address}")
     
     url = f"{ETHERSCAN_BASE_URL}?module=account&action=tokenbalance&contractaddress={contract_address}&address={address}&tag=latest&apikey={ETHERSCAN_API_KEY}"
     
+    data = await _etherscan_get(url, session)
+    logger.debug("Etherscan response for %s: %s", contract_address, data)
+    
+    if data.get("status") == "1":
+        raw_balance = int(data["result"])
+        return raw_balance / (_DIV.get(decimals) or 10 ** decimals)
+    raise Exception(f"Etherscan error: {data.get('message', 'Unknown error')}")
+
+async def get_erc20_balance(address: str, contract_address: str, decimals: int, session: aiohttp.ClientSession) -> float:
     try:
-        async with session.get(url) as response:
-            data = await response.json()
-            print(f"Etherscan response for {contract_address}:", data)
-            
-            if data.get("status") == "1":
-                raw_balance = int(data["result"])
-                return raw_balance / (10 ** decimals)
-            else:
-                print(f"Etherscan error for {contract_address}: {data.get('message', 'Unknown error')}")
-                return 0.0
+        return await fetch_erc20_balance(address, contract_address, decimals, session)
     except Exception as e:
-        print(f"Exception getting balance for {contract_address}: {e}")
+        logger.error("Exception getting balance for %s: %s", contract_address, e)
         return 0.0
 
-async def get_all_token_balances(address: str, session) -> dict:
+async def get_multi_balances(addresses: List[str], session) -> Dict[str, float]:
+    """ETH balances for many addresses, batched into balancemulti calls of up to 20 addresses"""
+    async def fetch_chunk(chunk: List[str]) -> Dict[str, float]:
+        url = f"{ETHERSCAN_BASE_URL}?module=account&action=balancemulti&address={','.join(chunk)}&tag=latest&apikey={ETHERSCAN_API_KEY}"
+        data = await _etherscan_get(url, session)
+        if data.get("status") != "1":
+            raise Exception(f"Etherscan error: {data.get('message')}")
+        return {entry["account"]: int(entry["balance"]) / _DIV[18] for entry in data["result"]}
+
+    chunks = [addresses[i:i + ETHERSCAN_MULTI_LIMIT] for i in range(0, len(addresses), ETHERSCAN_MULTI_LIMIT)]
     balances = {}
+    for chunk_balances in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+        balances.update(chunk_balances)
+    return balances
+
+# Cleared once Etherscan reports addresstokenbalance isn't available for our API key
+_token_holdings_supported = True
+
+async def get_address_token_balances(address: str, session) -> Optional[Dict[str, float]]:
+    """
+    All known ERC-20 balances for a wallet from a single addresstokenbalance call.
+    Returns None when the endpoint can't be used, so callers can fall back to per-token lookups.
+    """
+    global _token_holdings_supported
+    if not _token_holdings_supported:
+        return None
     
-    print(f"Fetching token balances for {len(ERC20_TOKENS)} tokens...")
+    url = f"{ETHERSCAN_BASE_URL}?module=account&action=addresstokenbalance&address={address}&page=1&offset=100&apikey={ETHERSCAN_API_KEY}"
+    try:
+        data = await _etherscan_get(url, session)
+    except Exception as e:
+        logger.warning("Token holdings lookup failed for %s: %s", address, e)
+        return None
+    
+    if data.get("status") != "1":
+        if _is_rate_limited(200, data):
+            return None
+        message = f"{data.get('message', '')} {data.get('result', '')}".lower()
+        if "no " in message and "found" in message:
+            return {}
+        # Any other refusal (API Pro only, unknown action on this network, NOTOK) won't
+        # change between calls, so stop spending limiter slots on it
+        logger.info("addresstokenbalance unavailable (%s); using per-token lookups", data.get("result") or data.get("message"))
+        _token_holdings_supported = False
+        return None
+    
+    balances = {}
+    for holding in data["result"]:
+        known = _TOKENS_BY_CONTRACT.get(holding.get("TokenAddress", "").lower())
+        if known:
+            token, decimals = known
+            amount = int(holding["TokenQuantity"]) / (_DIV.get(decimals) or 10 ** decimals)
+            if amount > 0:
+                balances[token] = amount
+    return balances
+
+# Balance lookups currently in progress, keyed like the cache; concurrent
+# callers for the same key await the same task
+_inflight: Dict[str, asyncio.Task] = {}
+
+def _forget_inflight(key: str, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Every caller may have gone away; don't warn about an unretrieved exception
+    if not task.cancelled():
+        task.exception()
+
+async def _single_flight(key: str, fetch: Callable[[], Awaitable[float]]) -> float:
+    task = _inflight.get(key)
+    if task is None:
+        # The fetch runs as its own task, so cancelling one caller never cancels it for the others
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _forget_inflight(key, done))
+    return await asyncio.shield(task)
+
+async def _cached_balance(key: str, fetch: Callable[[], Awaitable[float]]) -> float:
+    cached = await cache_get(key)
+    if cached is not None:
+        return float(cached)
+    balance = await fetch()
+    await cache_set(key, str(balance), BALANCE_CACHE_TTL)
+    return balance
+
+async def cached_get_eth_balance(address: str, session) -> float:
+    key = f"bal:eth:{address.lower()}"
+    return await _single_flight(
+        key, lambda: _cached_balance(key, lambda: get_eth_balance(address, session))
+    )
+
+async def cached_get_erc20_balance(address: str, contract_address: str, decimals: int, session: aiohttp.ClientSession) -> float:
+    key = f"bal:erc20:{contract_address.lower()}:{address.lower()}"
+    # Only successful lookups reach the cache; a failed one falls back to 0.0 uncached
+    try:
+        return await _single_flight(
+            key, lambda: _cached_balance(key, lambda: fetch_erc20_balance(address, contract_address, decimals, session))
+        )
+    except Exception as e:
+        logger.error("Exception getting balance for %s: %s", contract_address, e)
+        return 0.0
+
+async def get_all_token_balances(address: str, session) -> dict:
+    logger.debug("Fetching token balances for %d tokens", len(ERC20_TOKENS))
     
-    for i, (token, info) in enumerate(ERC20_TOKENS.items()):
-        # Add delay before each request (except the first one)
-        if i > 0:
-            print(f"Waiting 3 seconds before fetching {token} balance...")
-            await asyncio.sleep(3)
-        
-        print(f"Fetching {token} balance from contract {info['contract']}...")
-        
-        # Validate contract address before making the call
-        contract = info['contract']
-        if not contract or not contract.startswith('0x') or len(contract) != 42:
-            print(f"Skipping {token} - invalid contract address: {contract}")
-            continue
-            
-        amount = await get_erc20_balance(address, contract, info["decimals"], session)
-        
-        if amount > 0:
+    holdings = await get_address_token_balances(address, session)
+    if holdings is not None:
+        logger.debug("Final balances: %s", holdings)
+        return holdings
+    
+    # Contract addresses were validated at import
+    requests = {
+        token: get_erc20_balance(address, info["contract"], info["decimals"], session)
+        for token, info in ERC20_TOKENS.items()
+    }
+    
+    # Fetch every token at once; the shared limiter keeps us inside Etherscan's rate cap
+    results = await asyncio.gather(*requests.values(), return_exceptions=True)
+    
+    balances = {}
+    for token, amount in zip(requests, results):
+        if isinstance(amount, Exception):
+            logger.warning("%s balance: 0 (error: %s)", token, amount)
+        elif amount > 0:
             balances[token] = amount
-            print(f"{token} balance: {amount}")
+            logger.debug("%s balance: %s", token, amount)
         else:
-            print(f"{token} balance: 0 (or error)")
+            logger.debug("%s balance: 0 (or error)", token)
     
-    print(f"Final balances: {balances}")
-    return balances
\ No newline at end of file
+    logger.debug("Final balances: %s", balances)
+    return balances
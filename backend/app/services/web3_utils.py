@@ -1,11 +1,17 @@
 import asyncio
-import json
+import functools
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
+import aiohttp
+import orjson
 from app.config import get_env
+from eth_abi import decode, encode
 from eth_account import Account
-from web3 import Web3
+from eth_typing import HexStr
+from hexbytes import HexBytes
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.types import RPCEndpoint
 
 # Configuration
 NETWORK = get_env("NETWORK", "sepolia")
@@ -13,6 +19,9 @@ CHAIN_ID = int(get_env("CHAIN_ID", "11155111"))  # Sepolia
 RPC_URL = get_env("RPC_URL")
 PRIVATE_KEY = get_env("PRIVATE_KEY")
 
+# Same per-request timeout web3's HTTP provider uses
+RPC_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
 # Contract addresses on Sepolia testnet
 SEPOLIA_CONTRACTS = {
     "USDC": "0x14A3Fb98C14759169f998155ba4c31d1393D6D7c",  # Sepolia USDC own
@@ -20,11 +29,31 @@ SEPOLIA_CONTRACTS = {
     "WETH": "0xfFf9976782d46CC05630D1f6eBAb18b2324d6B14",  # Sepolia WETH
 }
 
-# Initialize Web3
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+# Client, account and anything derived from them are built on first use,
+# so importing this module never touches the network
+@functools.cache
+def _get_w3() -> AsyncWeb3:
+    # Async, so RPC round-trips don't block the event loop
+    return AsyncWeb3(AsyncHTTPProvider(RPC_URL))
+
+
+@functools.cache
+def _get_account():
+    return Account.from_key(PRIVATE_KEY) if PRIVATE_KEY else None
+
 
-# Load account from private key
-account = Account.from_key(PRIVATE_KEY) if PRIVATE_KEY else None
+# Fixed fields of the rebalance transaction: 0.001 ETH sent to self for simulation
+REBALANCE_VALUE_WEI = 10 ** 15
+
+
+@functools.cache
+def _get_tx_template() -> Dict[str, Any]:
+    account = _get_account()
+    return {
+        'to': account.address,
+        'value': REBALANCE_VALUE_WEI,
+        'chainId': CHAIN_ID
+    } if account else {}
 
 # ERC20 ABI (basic functions we need)
 ERC20_ABI = [
@@ -54,6 +83,121 @@ ERC20_ABI = [
     }
 ]
 
+# Multicall3 is deployed at the same address on every chain, Sepolia included
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+
+@functools.cache
+def _get_multicall():
+    return _get_w3().eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+# 4-byte selectors, so balance reads can skip the contract wrapper entirely
+_BALANCE_OF_SELECTOR = bytes(Web3.keccak(text="balanceOf(address)")[:4])
+_DECIMALS_SELECTOR = bytes(Web3.keccak(text="decimals()")[:4])
+
+# ERC20 decimals are immutable, so each token only needs to be asked once
+_KNOWN_DECIMALS = {"USDC": 6, "LINK": 18, "WETH": 18}
+_DECIMALS_CACHE: Dict[str, int] = {
+    Web3.to_checksum_address(SEPOLIA_CONTRACTS[token]): decimals
+    for token, decimals in _KNOWN_DECIMALS.items()
+}
+
+# Gas estimate: a basic transaction plus roughly 50,000 gas per trade
+BASE_GAS = 21000
+GAS_PER_TRADE = 50000
+_GAS_TABLE = {n: BASE_GAS + n * GAS_PER_TRADE for n in range(32)}
+WEI_PER_ETH = 10 ** 18
+
+# EIP-1559 fees (next base fee, median tip over the last 5 blocks) are
+# reused for one block (~12s on Sepolia) across transactions and estimates
+FEE_CACHE_TTL = 12
+_FEE_CACHE: Optional[Tuple[int, int]] = None
+_fee_cache_fetched_at = 0.0
+
+
+async def _get_fees() -> Tuple[int, int]:
+    global _FEE_CACHE, _fee_cache_fetched_at
+    now = time.monotonic()
+    if _FEE_CACHE is None or now - _fee_cache_fetched_at >= FEE_CACHE_TTL:
+        history = await _get_w3().eth.fee_history(5, 'latest', [50])
+        base_fee = history['baseFeePerGas'][-1]
+        tips = sorted(reward[0] for reward in history['reward'])
+        _FEE_CACHE = (base_fee, tips[len(tips) // 2])
+        _fee_cache_fetched_at = now
+    return _FEE_CACHE
+
+
+# is_connected() costs a round-trip, so a passing check is trusted for a while
+# and only dropped again when an RPC fails
+CONNECTION_CHECK_TTL = 30
+_last_connected_ts = 0.0
+_validated = False
+
+
+async def _ensure_connected(ttl: int = CONNECTION_CHECK_TTL) -> bool:
+    global _validated
+    if not _validated:
+        # First use validates the node and chain ID; retried until the node is reached
+        await validate_web3_connection()
+        _validated = _last_connected_ts > 0
+        return _validated
+    if time.monotonic() - _last_connected_ts < ttl:
+        return True
+    if await _get_w3().is_connected():
+        _mark_connected()
+        return True
+    return False
+
+
+def _mark_connected():
+    global _last_connected_ts
+    _last_connected_ts = time.monotonic()
+
+
+def _mark_disconnected():
+    global _last_connected_ts
+    _last_connected_ts = 0.0
+
+
+# Chain ID is fixed per endpoint, fetched once on first use
+_chain_id: Optional[int] = None
+
+
+async def _get_chain_id() -> int:
+    global _chain_id
+    if _chain_id is None:
+        _chain_id = await _get_w3().eth.chain_id
+    return _chain_id
+
 
 async def execute_rebalance_transaction(
     wallet_address: str, 
@@ -75,18 +219,23 @@ async def execute_rebalance_transaction(
         Dictionary with transaction hash and gas information
     """
     try:
+        w3 = _get_w3()
+        account = _get_account()
         if not account:
             raise Exception("Private key not configured")
         
-        if not w3.is_connected():
+        # Connectivity, nonce and fees are independent lookups
+        connected, nonce, (base_fee, tip) = await asyncio.gather(
+            _ensure_connected(),
+            w3.eth.get_transaction_count(account.address),
+            _get_fees()
+        )
+        if not connected:
             raise Exception("Failed to connect to Ethereum network")
 
         print(f"[INFO] Executing rebalance for wallet: {wallet_address}")
         print(f"[INFO] Target allocation: {target_allocation}")
         print(f"[INFO] Trades to execute: {trades}")
-
-        # Get current nonce
-        nonce = w3.eth.get_transaction_count(account.address)
         
         # For testnet simulation, we'll send a simple ETH transaction with data
         # that represents the rebalancing operation
@@ -99,23 +248,20 @@ async def execute_rebalance_transaction(
             "wallet": wallet_address
         }
         
-        # Convert to hex data for transaction
-        data_string = json.dumps(rebalance_data)
-        data_hex = "0x" + data_string.encode('utf-8').hex()
-        
-        # Get current gas price
-        gas_price = w3.eth.gas_price
+        # web3 accepts raw bytes for data and hex-encodes them itself
+        data_bytes = orjson.dumps(rebalance_data)
         
         # Create transaction (sending minimal ETH to self with rebalance data)
         transaction = {
-            'to': account.address,  # Send to self for simulation
-            'value': w3.to_wei(0.001, 'ether'),  # Minimal ETH amount
-            'gasPrice': gas_price,
+            **_get_tx_template(),
+            'type': 2,
+            # Room for the base fee to double before the transaction stalls
+            'maxFeePerGas': 2 * base_fee + tip,
+            'maxPriorityFeePerGas': tip,
             'nonce': nonce,
-            'data': data_hex,
-            'chainId': CHAIN_ID
+            'data': data_bytes
         }
-        estimated_gas = w3.eth.estimate_gas(transaction)
+        estimated_gas = await w3.eth.estimate_gas(transaction)
         print(f"Estimated gas: {estimated_gas}")
 
         # Add buffer (e.g. +20%)
@@ -124,21 +270,27 @@ async def execute_rebalance_transaction(
         # Sign transaction
         signed_txn = w3.eth.account.sign_transaction(transaction, PRIVATE_KEY)
         
-        # Send transaction
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        tx_hash_hex = tx_hash.hex()
+        # Send transaction straight to the provider; the hash comes back already hex-encoded
+        response = await w3.provider.make_request(
+            RPCEndpoint("eth_sendRawTransaction"),
+            [HexStr(signed_txn.raw_transaction.to_0x_hex())]
+        )
+        if "error" in response:
+            raise Exception(response["error"].get("message", response["error"]))
+        tx_hash_hex = response["result"]
         
         print(f"[SUCCESS] Rebalance transaction sent: {tx_hash_hex}")
         
         return {
             "tx_hash": tx_hash_hex,
             "gas_used": str(transaction['gas']),
-            "gas_price": str(gas_price),
+            "gas_price": str(transaction['maxFeePerGas']),
             "network": NETWORK,
             "status": "pending"
         }
         
     except Exception as e:
+        _mark_disconnected()
         print(f"[ERROR] Failed to execute rebalance transaction: {str(e)}")
         raise Exception(f"Transaction execution failed: {str(e)}")
 
@@ -154,31 +306,32 @@ async def get_transaction_status(tx_hash: str) -> str:
         Transaction status: 'pending', 'confirmed', or 'failed'
     """
     try:
-        if not w3.is_connected():
+        if not await _ensure_connected():
             return "unknown"
         
-        # Get transaction receipt
-        try:
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
-            
-            if receipt.status == 1:
+        # Older records stored the hash without its 0x prefix
+        if not tx_hash.startswith("0x"):
+            tx_hash = "0x" + tx_hash
+        
+        # Receipt and mempool entry in one batch; either comes back null if missing
+        receipt, tx = await _rpc_batch([
+            ("eth_getTransactionReceipt", [tx_hash]),
+            ("eth_getTransactionByHash", [tx_hash])
+        ])
+        
+        if receipt:
+            if int(receipt["status"], 16) == 1:
                 return "confirmed"
             else:
                 return "failed"
-                
-        except Exception:
-            # Transaction not yet mined
-            try:
-                # Check if transaction exists in mempool
-                tx = w3.eth.get_transaction(tx_hash)
-                if tx:
-                    return "pending"
-                else:
-                    return "not_found"
-            except Exception:
-                return "not_found"
+        
+        # Transaction not yet mined, check if it exists in mempool
+        if tx:
+            return "pending"
+        return "not_found"
                 
     except Exception as e:
+        _mark_disconnected()
         print(f"[ERROR] Failed to check transaction status: {str(e)}")
         return "unknown"
 
@@ -194,26 +347,24 @@ async def estimate_gas_fees(trades: Dict[str, Any]) -> str:
         Estimated gas fees in ETH as string
     """
     try:
-        if not w3.is_connected():
+        if not await _ensure_connected():
             return "0.001"  # Default estimate
         
-        # Get current gas price
-        gas_price = w3.eth.gas_price
+        # Expected price per gas: next base fee plus the typical tip
+        base_fee, tip = await _get_fees()
+        gas_price = base_fee + tip
         
         # Estimate gas needed based on number of trades
-        base_gas = 21000  # Basic transaction
         trade_count = len(trades)
-        
-        # Each trade operation adds approximately 50,000 gas
-        estimated_gas = base_gas + (trade_count * 50000)
+        estimated_gas = _GAS_TABLE.get(trade_count, BASE_GAS + trade_count * GAS_PER_TRADE)
         
         # Calculate total fee in ETH
-        total_fee_wei = estimated_gas * gas_price
-        total_fee_eth = w3.from_wei(total_fee_wei, 'ether')
+        total_fee_eth = estimated_gas * gas_price / WEI_PER_ETH
         
         return f"{total_fee_eth:.6f}"
         
     except Exception as e:
+        _mark_disconnected()
         print(f"[ERROR] Failed to estimate gas fees: {str(e)}")
         return "0.001"  # Fallback estimate
 
@@ -230,31 +381,183 @@ async def get_token_balance_web3(token_address: str, wallet_address: str) -> flo
         Token balance as float
     """
     try:
-        if not w3.is_connected():
+        if not await _ensure_connected():
             raise Exception("Web3 not connected")
         
-        # Create contract instance
-        contract = w3.eth.contract(
-            address=Web3.to_checksum_address(token_address),
-            abi=ERC20_ABI
-        )
+        token_address = Web3.to_checksum_address(token_address)
         
         # Get balance
-        balance = contract.functions.balanceOf(
-            Web3.to_checksum_address(wallet_address)
-        ).call()
+        balance_ret = await _get_w3().eth.call({
+            "to": token_address,
+            "data": _BALANCE_OF_SELECTOR + encode(["address"], [Web3.to_checksum_address(wallet_address)])
+        })
+        balance = decode(["uint256"], balance_ret)[0]
         
         # Get decimals
-        decimals = contract.functions.decimals().call()
+        decimals = _DECIMALS_CACHE.get(token_address)
+        if decimals is None:
+            decimals_ret = await _get_w3().eth.call({"to": token_address, "data": _DECIMALS_SELECTOR})
+            decimals = decode(["uint8"], decimals_ret)[0]
+            _DECIMALS_CACHE[token_address] = decimals
         
         # Convert to human readable format
         return balance / (10 ** decimals)
         
     except Exception as e:
+        _mark_disconnected()
         print(f"[ERROR] Failed to get token balance: {str(e)}")
         return 0.0
 
 
+async def get_token_balances_multicall(tokens: List[str], wallet_address: str) -> Dict[str, float]:
+    """
+    Get several ERC20 token balances in a single Multicall3 call.
+    
+    Args:
+        tokens: Contract addresses of the tokens
+        wallet_address: Wallet address to check
+    
+    Returns:
+        Dictionary of token address to balance as float
+    """
+    try:
+        if not await _ensure_connected():
+            raise Exception("Web3 not connected")
+        
+        balance_data = _BALANCE_OF_SELECTOR + encode(
+            ["address"], [Web3.to_checksum_address(wallet_address)]
+        )
+        
+        # balanceOf for every token, plus decimals() for tokens not seen before
+        calls = []
+        plan = []
+        for token in tokens:
+            token_address = Web3.to_checksum_address(token)
+            needs_decimals = token_address not in _DECIMALS_CACHE
+            calls.append((token_address, True, balance_data))
+            if needs_decimals:
+                calls.append((token_address, True, _DECIMALS_SELECTOR))
+            plan.append((token, token_address, needs_decimals))
+        
+        results = iter(await _get_multicall().functions.aggregate3(calls).call())
+        
+        balances = {}
+        for token, token_address, needs_decimals in plan:
+            balance_ok, balance_ret = next(results)
+            if needs_decimals:
+                decimals_ok, decimals_ret = next(results)
+                if decimals_ok and decimals_ret:
+                    _DECIMALS_CACHE[token_address] = decode(["uint8"], decimals_ret)[0]
+            
+            decimals = _DECIMALS_CACHE.get(token_address)
+            if not balance_ok or not balance_ret or decimals is None:
+                print(f"[ERROR] Failed to get token balance for {token}")
+                balances[token] = 0.0
+                continue
+            
+            balances[token] = decode(["uint256"], balance_ret)[0] / (10 ** decimals)
+        
+        return balances
+        
+    except Exception as e:
+        _mark_disconnected()
+        print(f"[ERROR] Failed to get token balances: {str(e)}")
+        return {token: 0.0 for token in tokens}
+
+
+async def _rpc_batch(calls: List[Tuple[str, list]]) -> List[Any]:
+    """
+    Send several JSON-RPC calls to the node in one HTTP request.
+    
+    Args:
+        calls: (method, params) pairs
+    
+    Returns:
+        Results in the same order as calls, None for calls that errored
+    """
+    # Imported here: startup imports the autonomous agent, which imports this module
+    from app.services.startup import startup_service
+    
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    
+    session = startup_service.get_session()
+    async with session.post(
+        RPC_URL,
+        data=orjson.dumps(payload),
+        headers={"Content-Type": "application/json"},
+        timeout=RPC_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        replies = orjson.loads(await response.read())
+    
+    # A rejected batch comes back as a single error object
+    if isinstance(replies, dict):
+        raise Exception(f"RPC batch rejected: {replies.get('error')}")
+    
+    # Replies may arrive in any order, so match them back up by id
+    results = [None] * len(calls)
+    for reply in replies:
+        results[reply["id"]] = reply.get("result")
+    return results
+
+
+async def batch_get_balances(wallet_address: str, token_addresses: List[str]) -> Dict[str, float]:
+    """
+    Get the ETH balance and ERC20 balances of a wallet in one JSON-RPC batch.
+    
+    Args:
+        wallet_address: Wallet address to check
+        token_addresses: Contract addresses of the tokens
+    
+    Returns:
+        Dictionary with "ETH" and each token address mapped to its balance as float
+    """
+    try:
+        wallet = Web3.to_checksum_address(wallet_address)
+        balance_data = HexBytes(_BALANCE_OF_SELECTOR + encode(["address"], [wallet])).to_0x_hex()
+        decimals_data = HexBytes(_DECIMALS_SELECTOR).to_0x_hex()
+        
+        calls = [("eth_getBalance", [wallet, "latest"])]
+        plan = []
+        for token in token_addresses:
+            token_address = Web3.to_checksum_address(token)
+            needs_decimals = token_address not in _DECIMALS_CACHE
+            calls.append(("eth_call", [{"to": token_address, "data": balance_data}, "latest"]))
+            if needs_decimals:
+                calls.append(("eth_call", [{"to": token_address, "data": decimals_data}, "latest"]))
+            plan.append((token, token_address, needs_decimals))
+        
+        results = iter(await _rpc_batch(calls))
+        
+        eth_wei = next(results)
+        balances = {"ETH": float(Web3.from_wei(int(eth_wei, 16), 'ether')) if eth_wei else 0.0}
+        
+        for token, token_address, needs_decimals in plan:
+            balance_ret = next(results)
+            if needs_decimals:
+                decimals_ret = next(results)
+                if decimals_ret and decimals_ret != "0x":
+                    _DECIMALS_CACHE[token_address] = int(decimals_ret, 16)
+            
+            decimals = _DECIMALS_CACHE.get(token_address)
+            if not balance_ret or balance_ret == "0x" or decimals is None:
+                print(f"[ERROR] Failed to get token balance for {token}")
+                balances[token] = 0.0
+                continue
+            
+            balances[token] = int(balance_ret, 16) / (10 ** decimals)
+        
+        return balances
+        
+    except Exception as e:
+        _mark_disconnected()
+        print(f"[ERROR] Failed to get balances: {str(e)}")
+        return {"ETH": 0.0, **{token: 0.0 for token in token_addresses}}
+
+
 async def get_eth_balance_web3(wallet_address: str) -> float:
     """
     Get ETH balance using Web3.
@@ -266,20 +569,31 @@ async def get_eth_balance_web3(wallet_address: str) -> float:
         ETH balance as float
     """
     try:
-        if not w3.is_connected():
+        if not await _ensure_connected():
             raise Exception("Web3 not connected")
         
-        balance_wei = w3.eth.get_balance(Web3.to_checksum_address(wallet_address))
-        balance_eth = w3.from_wei(balance_wei, 'ether')
+        balance_wei = await _get_w3().eth.get_balance(Web3.to_checksum_address(wallet_address))
+        balance_eth = Web3.from_wei(balance_wei, 'ether')
         
         return float(balance_eth)
         
     except Exception as e:
+        _mark_disconnected()
         print(f"[ERROR] Failed to get ETH balance: {str(e)}")
         return 0.0
 
 
-def validate_web3_connection() -> bool:
+async def attach_web3_session(session: aiohttp.ClientSession):
+    """
+    Route provider traffic over the app's shared keep-alive session.
+    
+    Args:
+        session: Shared aiohttp session
+    """
+    await _get_w3().provider.cache_async_session(session)
+
+
+async def validate_web3_connection() -> bool:
     """
     Validate Web3 connection and configuration.
     
@@ -287,16 +601,18 @@ def validate_web3_connection() -> bool:
         True if connection is valid, False otherwise
     """
     try:
-        if not w3.is_connected():
+        if not await _get_w3().is_connected():
             print("[ERROR] Web3 not connected to network")
             return False
+        _mark_connected()
         
+        account = _get_account()
         if not account:
             print("[ERROR] Account not configured")
             return False
         
         # Check network
-        chain_id = w3.eth.chain_id
+        chain_id = await _get_chain_id()
         if chain_id != CHAIN_ID:
             print(f"[WARNING] Chain ID mismatch. Expected: {CHAIN_ID}, Got: {chain_id}")
         
@@ -306,15 +622,12 @@ def validate_web3_connection() -> bool:
         return True
         
     except Exception as e:
+        _mark_disconnected()
         print(f"[ERROR] Web3 validation failed: {str(e)}")
         return False
 
 
-# Initialize connection on import
 if __name__ == "__main__":
     # Test connection
-    is_valid = validate_web3_connection()
-    print(f"Web3 connection valid: {is_valid}")
-else:
-    # Validate connection when module is imported
-    validate_web3_connection()
\ No newline at end of file
+    is_valid = asyncio.run(validate_web3_connection())
+    print(f"Web3 connection valid: {is_valid}")
\ No newline at end of file
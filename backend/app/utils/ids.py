@@ -0,0 +1,20 @@
+import secrets
+import time
+
+
+def time_ordered_id(prefix: str) -> str:
+    """
+    Generate an ID whose leading part is the creation time, UUIDv7-style.
+
+    The first 12 hex characters are milliseconds since the epoch, so new IDs
+    sort after older ones and index inserts land on the right-most leaf. The
+    8 random hex characters that follow keep IDs generated in the same
+    millisecond distinct.
+
+    Args:
+        prefix: Label prepended to the ID, e.g. "strategy"
+
+    Returns:
+        ID such as "strategy_0192a3b4c5d6e7f80a1b"
+    """
+    return f"{prefix}_{time.time_ns() // 1_000_000:012x}{secrets.token_hex(4)}"
@@ -7,6 +7,8 @@ import asyncio
 import sys
 import os
 
+import orjson
+
 # Add the backend directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
@@ -14,19 +16,27 @@ from app.db.mongo import wallet_monitoring_configs, setup_database
 from app.services.autonomous_agent import autonomous_agent_service, MonitoringConfig
 from datetime import datetime, timezone
 
+def to_json(value) -> str:
+    """Indented JSON for debug output; ObjectIds and other non-JSON values print as str"""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC, default=str).decode()
+
+async def get_config_snapshot():
+    """Total count, enabled count and all configs from a single find"""
+    all_configs = await wallet_monitoring_configs.find({}).to_list(length=None)
+    enabled = sum(1 for config in all_configs if config.get("enabled"))
+    return len(all_configs), enabled, all_configs
+
 async def test_wallet_monitoring():
     """Test wallet monitoring operations"""
     print("🔧 Setting up database...")
     await setup_database()
     
     print("\n📊 Current database state:")
-    total_configs = await wallet_monitoring_configs.count_documents({})
-    enabled_configs = await wallet_monitoring_configs.count_documents({"enabled": True})
+    total_configs, enabled_configs, all_configs = await get_config_snapshot()
     print(f"Total configs: {total_configs}")
     print(f"Enabled configs: {enabled_configs}")
     
     # List all configs
-    all_configs = await wallet_monitoring_configs.find({}).to_list(length=None)
     print(f"\n📋 All configs in database:")
     for config in all_configs:
         print(f"  - {config['wallet_address']}: enabled={config.get('enabled', False)}")
@@ -60,13 +70,11 @@ async def test_wallet_monitoring():
         traceback.print_exc()
     
     print("\n📊 Database state after addition:")
-    total_configs_after = await wallet_monitoring_configs.count_documents({})
-    enabled_configs_after = await wallet_monitoring_configs.count_documents({"enabled": True})
+    total_configs_after, enabled_configs_after, all_configs_after = await get_config_snapshot()
     print(f"Total configs: {total_configs_after}")
     print(f"Enabled configs: {enabled_configs_after}")
     
     # List all configs again
-    all_configs_after = await wallet_monitoring_configs.find({}).to_list(length=None)
     print(f"\n📋 All configs in database after addition:")
     for config in all_configs_after:
         print(f"  - {config['wallet_address']}: enabled={config.get('enabled', False)}")
@@ -75,7 +83,7 @@ async def test_wallet_monitoring():
     print(f"\n🔍 Testing specific wallet query for {test_wallet}:")
     specific_config = await wallet_monitoring_configs.find_one({"wallet_address": test_wallet})
     if specific_config:
-        print(f"✅ Found config: {specific_config}")
+        print(f"✅ Found config: {to_json(specific_config)}")
     else:
         print(f"❌ No config found for {test_wallet}")
     
@@ -90,7 +98,7 @@ async def test_wallet_monitoring():
     print(f"\n📊 Testing service status:")
     try:
         status = await autonomous_agent_service.get_monitoring_status()
-        print(f"Service status: {status}")
+        print(f"Service status: {to_json(status)}")
     except Exception as e:
         print(f"❌ Error getting service status: {str(e)}")
 
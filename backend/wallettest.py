@@ -20,18 +20,24 @@ w3 = Web3(Web3.HTTPProvider(RPC_URL))
 print("Connected:", w3.is_connected())
 
 
+# Fields that never change between sends: 0.001 ETH to self on Sepolia
+_TX_TEMPLATE = {
+    'to': WALLET_ADDRESS,
+    'value': 10 ** 15,
+    'gas': 21000,
+    'chainId': 11155111,
+}
+
+
 def send_tx():
     nonce = w3.eth.get_transaction_count(WALLET_ADDRESS)
     tx = {
+        **_TX_TEMPLATE,
         'nonce': nonce,
-        'to': WALLET_ADDRESS, 
-        'value': w3.to_wei(0.001, 'ether'),
-        'gas': 21000,
         'gasPrice': w3.eth.gas_price,
-        'chainId': 11155111,
     }
     signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
     tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-    print("Transaction hash:", tx_hash.hex())
+    print("Transaction hash:", tx_hash.to_0x_hex())
 
 send_tx()